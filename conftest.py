@@ -0,0 +1,25 @@
+"""
+Root conftest: command-line options shared by the whole suite
+"""
+
+import os
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--replay", action="store_true", default=False,
+        help="Serve responses recorded by a RECORD=record run instead of "
+             "dispatching requests through the app",
+    )
+
+
+def pytest_configure(config):
+    # Recordings are per-session response sequences: under xdist each worker
+    # would overwrite the cache with only its own tests in record mode, and
+    # replay depends on the same serial order the recording run saw.
+    if config.getoption("--replay") or os.environ.get("RECORD") == "record":
+        if getattr(config.option, "numprocesses", 0):
+            raise pytest.UsageError(
+                "record/replay requires a single serial run; pass -n 0")
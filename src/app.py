@@ -5,9 +5,10 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
+import orjson
 import os
 from pathlib import Path
 
@@ -19,73 +20,96 @@ current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
+# In-memory activity database. Participants are stored as sets so the
+# signup duplicate check and unregister removal are O(1); the GET endpoint
+# serializes them as sorted lists.
 activities = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+        "participants": {"michael@mergington.edu", "daniel@mergington.edu"}
     },
     "Programming Class": {
         "description": "Learn programming fundamentals and build software projects",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+        "participants": {"emma@mergington.edu", "sophia@mergington.edu"}
     },
     "Gym Class": {
         "description": "Physical education and sports activities",
         "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
         "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+        "participants": {"john@mergington.edu", "olivia@mergington.edu"}
     },
     "Basketball Team": {
         "description": "Join our competitive basketball team and develop athletic skills",
         "schedule": "Mondays and Wednesdays, 4:00 PM - 5:30 PM",
         "max_participants": 15,
-        "participants": ["alex@mergington.edu"]
+        "participants": {"alex@mergington.edu"}
     },
     "Tennis Club": {
         "description": "Learn tennis techniques and participate in friendly matches",
         "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:00 PM",
         "max_participants": 10,
-        "participants": ["grace@mergington.edu", "james@mergington.edu"]
+        "participants": {"grace@mergington.edu", "james@mergington.edu"}
     },
     "Drama Club": {
         "description": "Perform in theatrical productions and develop acting skills",
         "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
         "max_participants": 20,
-        "participants": ["isabella@mergington.edu"]
+        "participants": {"isabella@mergington.edu"}
     },
     "Art Studio": {
         "description": "Create paintings, sculptures, and digital art in a collaborative studio",
         "schedule": "Mondays and Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 16,
-        "participants": ["nina@mergington.edu", "lucas@mergington.edu"]
+        "participants": {"nina@mergington.edu", "lucas@mergington.edu"}
     },
     "Debate Team": {
         "description": "Develop critical thinking and public speaking through competitive debates",
         "schedule": "Thursdays, 3:30 PM - 5:00 PM",
         "max_participants": 14,
-        "participants": ["marcus@mergington.edu"]
+        "participants": {"marcus@mergington.edu"}
     },
     "Robotics Club": {
         "description": "Build and program robots to compete in regional competitions",
         "schedule": "Tuesdays, 4:00 PM - 5:30 PM",
         "max_participants": 18,
-        "participants": ["ryan@mergington.edu", "sophia@mergington.edu"]
+        "participants": {"ryan@mergington.edu", "sophia@mergington.edu"}
     }
 }
 
 
+# Serialized /activities payload, rebuilt lazily after each mutation. The
+# generation counter doubles as a weak ETag so clients can revalidate reads
+# with If-None-Match instead of re-downloading an unchanged body.
+_activities_cache = {"gen": 0, "body": None}
+
+
+def _invalidate_activities_cache():
+    """Drop the cached /activities payload after the data changes"""
+    _activities_cache["gen"] += 1
+    _activities_cache["body"] = None
+
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
 
 
 @app.get("/activities")
-def get_activities():
-    return activities
+def get_activities(request: Request):
+    etag = f'W/"{_activities_cache["gen"]}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    if _activities_cache["body"] is None:
+        snapshot = {name: {**activity,
+                           "participants": sorted(activity["participants"])}
+                    for name, activity in activities.items()}
+        _activities_cache["body"] = orjson.dumps(snapshot)
+    return Response(content=_activities_cache["body"],
+                    media_type="application/json", headers={"ETag": etag})
 
 
 @app.post("/activities/{activity_name}/signup")
@@ -103,7 +127,8 @@ def signup_for_activity(activity_name: str, email: str):
         raise HTTPException(status_code=400, detail="Student is already signed up for this activity")
 
     # Add student
-    activity["participants"].append(email)
+    activity["participants"].add(email)
+    _invalidate_activities_cache()
     return {"message": f"Signed up {email} for {activity_name}"}
 
 @app.delete("/activities/{activity_name}/unregister")
@@ -121,5 +146,6 @@ def unregister_from_activity(activity_name: str, email: str):
         raise HTTPException(status_code=400, detail="Student is not signed up for this activity")
 
     # Remove student
-    activity["participants"].remove(email)
+    activity["participants"].discard(email)
+    _invalidate_activities_cache()
     return {"message": f"Unregistered {email} from {activity_name}"}
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""
+Shared fixtures for the Mergington High School Activities API tests
+"""
+
+import hashlib
+import os
+import pickle
+
+import httpx
+import pytest
+import sys
+from pathlib import Path
+
+# Add src directory to path so we can import app
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from app import app
+
+
+# Initial state of the in-memory activity database, frozen once at import.
+# Tests get a fresh mutable copy via _fresh_activities in reset_activities.
+_INITIAL_ACTIVITIES = {
+    "Chess Club": {
+        "description": "Learn strategies and compete in chess tournaments",
+        "schedule": "Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 12,
+        "participants": {"michael@mergington.edu", "daniel@mergington.edu"}
+    },
+    "Programming Class": {
+        "description": "Learn programming fundamentals and build software projects",
+        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        "max_participants": 20,
+        "participants": {"emma@mergington.edu", "sophia@mergington.edu"}
+    },
+    "Gym Class": {
+        "description": "Physical education and sports activities",
+        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        "max_participants": 30,
+        "participants": {"john@mergington.edu", "olivia@mergington.edu"}
+    },
+    "Basketball Team": {
+        "description": "Join our competitive basketball team and develop athletic skills",
+        "schedule": "Mondays and Wednesdays, 4:00 PM - 5:30 PM",
+        "max_participants": 15,
+        "participants": {"alex@mergington.edu"}
+    },
+    "Tennis Club": {
+        "description": "Learn tennis techniques and participate in friendly matches",
+        "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:00 PM",
+        "max_participants": 10,
+        "participants": {"grace@mergington.edu", "james@mergington.edu"}
+    },
+    "Drama Club": {
+        "description": "Perform in theatrical productions and develop acting skills",
+        "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
+        "max_participants": 20,
+        "participants": {"isabella@mergington.edu"}
+    },
+    "Art Studio": {
+        "description": "Create paintings, sculptures, and digital art in a collaborative studio",
+        "schedule": "Mondays and Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 16,
+        "participants": {"nina@mergington.edu", "lucas@mergington.edu"}
+    },
+    "Debate Team": {
+        "description": "Develop critical thinking and public speaking through competitive debates",
+        "schedule": "Thursdays, 3:30 PM - 5:00 PM",
+        "max_participants": 14,
+        "participants": {"marcus@mergington.edu"}
+    },
+    "Robotics Club": {
+        "description": "Build and program robots to compete in regional competitions",
+        "schedule": "Tuesdays, 4:00 PM - 5:30 PM",
+        "max_participants": 18,
+        "participants": {"ryan@mergington.edu", "sophia@mergington.edu"}
+    }
+}
+
+
+def _fresh_activities():
+    """Build a mutable two-level clone of the initial snapshot.
+
+    Only the outer dict, the per-activity dicts and the participants sets
+    are ever mutated; strings and ints are immutable and safely shared, so
+    this avoids the full deepcopy machinery.
+    """
+    return {name: {**activity, "participants": set(activity["participants"])}
+            for name, activity in _INITIAL_ACTIVITIES.items()}
+
+
+class CachingAsyncClient(httpx.AsyncClient):
+    """Async client that caches GET responses between mutations.
+
+    Successful POST/DELETE requests bump a generation counter, and GET
+    responses are cached per (url, generation), so repeated reads of
+    unchanged state skip ASGI dispatch and JSON serialization entirely.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._gen = 0
+        self._get_cache = {}
+        self._recorder = None
+
+    async def request(self, method, url, **kwargs):
+        if self._recorder is not None:
+            return await self._recorder.dispatch(
+                super().request, method, url, **kwargs)
+        return await super().request(method, url, **kwargs)
+
+    def invalidate(self):
+        """Drop cached GET responses after state changed."""
+        self._gen += 1
+        self._get_cache.clear()
+
+    async def get(self, url, **kwargs):
+        if kwargs:
+            return await super().get(url, **kwargs)
+        key = (url, self._gen)
+        if key not in self._get_cache:
+            self._get_cache[key] = await super().get(url)
+        return self._get_cache[key]
+
+    async def post(self, url, **kwargs):
+        response = await super().post(url, **kwargs)
+        if response.is_success:
+            self.invalidate()
+        return response
+
+    async def delete(self, url, **kwargs):
+        response = await super().delete(url, **kwargs)
+        if response.is_success:
+            self.invalidate()
+        return response
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run the whole session on one asyncio event loop"""
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """Create an in-process async test client shared across the session"""
+    async with CachingAsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as c:
+        yield c
+
+
+def _install_fresh_state(mp, client):
+    """Swap a pristine activities dict into the app and drop both caches"""
+    import app as app_module
+
+    mp.setattr(app_module, "activities", _fresh_activities())
+    app_module._invalidate_activities_cache()
+    client.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def reset_activities(client, monkeypatch):
+    """Give each test its own pristine copy of the activities state"""
+    _install_fresh_state(monkeypatch, client)
+
+    yield
+
+
+@pytest.fixture(scope="class")
+def reset_activities_class(client):
+    """Install pristine state once for a whole class of read-only tests"""
+    with pytest.MonkeyPatch.context() as mp:
+        _install_fresh_state(mp, client)
+        yield
+
+
+# --- Record/replay of endpoint responses -----------------------------------
+#
+# A run with RECORD=record pickles every test's response sequence, keyed on a
+# hash of the app source. A later run with --replay serves those responses
+# directly, skipping FastAPI entirely — useful for CI runs of changes that
+# cannot affect app.py. Record with -n 0 so one process sees every test.
+
+_RESPONSE_CACHE = Path(__file__).parent / ".response_cache.pkl"
+
+
+def _app_source_hash():
+    """Hash the app source so stale recordings are rejected"""
+    import app as app_module
+
+    with open(app_module.__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ResponseRecorder:
+    """Record or replay the per-test sequence of client responses.
+
+    In record mode requests pass through to the app and the responses are
+    appended to the running test's log. In replay mode each request is
+    answered from the log in order, without touching the app at all.
+    """
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.logs = {}
+        self.current = None
+
+    async def dispatch(self, real_request, method, url, **kwargs):
+        if self.replay:
+            expected, recorded = self.current.pop(0)
+            assert expected == (str(method), str(url)), (
+                f"replay log diverged: recorded {expected}, "
+                f"got {(str(method), str(url))}")
+            status, headers, content = recorded
+            return httpx.Response(status_code=status, headers=headers,
+                                  content=content)
+        response = await real_request(method, url, **kwargs)
+        self.current.append(((str(method), str(url)),
+                             (response.status_code, dict(response.headers),
+                              response.content)))
+        return response
+
+
+@pytest.fixture(scope="session")
+def response_recorder(request):
+    """Set up record or replay mode for the session, or neither"""
+    if request.config.getoption("--replay"):
+        if not _RESPONSE_CACHE.exists():
+            raise pytest.UsageError(
+                "--replay requires a prior RECORD=record run")
+        with open(_RESPONSE_CACHE, "rb") as f:
+            source_hash, logs = pickle.load(f)
+        if source_hash != _app_source_hash():
+            raise pytest.UsageError(
+                "recorded responses are stale; re-run with RECORD=record")
+        recorder = ResponseRecorder(replay=True)
+        recorder.logs = logs
+        yield recorder
+        return
+
+    if os.environ.get("RECORD") == "record":
+        recorder = ResponseRecorder(replay=False)
+        yield recorder
+        with open(_RESPONSE_CACHE, "wb") as f:
+            pickle.dump((_app_source_hash(), recorder.logs), f)
+        return
+
+    yield None
+
+
+@pytest.fixture
+def live_app_state(response_recorder):
+    """Skip tests that assert on in-process app state when replaying.
+
+    Replayed responses never reach the app, so mutations leave
+    app.activities untouched and direct dict assertions cannot hold.
+    """
+    if response_recorder is not None and response_recorder.replay:
+        pytest.skip("asserts on in-process state, which --replay never mutates")
+
+
+@pytest.fixture(autouse=True)
+def _record_replay(request, client, response_recorder):
+    """Point the client at the current test's response log"""
+    if response_recorder is None:
+        yield
+        return
+
+    nodeid = request.node.nodeid
+    if response_recorder.replay:
+        response_recorder.current = list(response_recorder.logs[nodeid])
+    else:
+        response_recorder.current = response_recorder.logs.setdefault(
+            nodeid, [])
+    client._recorder = response_recorder
+
+    yield
+
+    client._recorder = None